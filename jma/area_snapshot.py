@@ -0,0 +1,272 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+
+# areas.json と同じディレクトリにスナップショットを置く
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+AREA_FILE_PATH = os.path.join(BASE_DIR, "areas.json")
+SNAPSHOT_PATH = os.path.join(BASE_DIR, "areas.snapshot")
+
+MAGIC = b"JMAAREA2"
+# 階層の順番（各階層の親は1つ前の階層）
+LEVELS = ("centers", "offices", "class10s", "class15s", "class20s")
+# 文字列として保持する項目（階層によっては存在しない）
+FIELDS = ("name", "enName", "officeName", "kana")
+MISSING = 0xFFFFFFFF  # 項目が無いことを表す文字列番号
+HEADER = struct.Struct("<8s" + "I" * (2 + len(LEVELS)))
+
+
+# ------------------------------
+# 1. ビルド（areas.json -> バイナリスナップショット）
+# ------------------------------
+
+def build_snapshot(src_path=AREA_FILE_PATH, dst_path=SNAPSHOT_PATH):
+    """areas.json を読み込み、スナップショットを書き出す"""
+    with open(src_path, "r", encoding="utf-8") as f:
+        areas_data = json.load(f)
+    return write_snapshot(areas_data, dst_path)
+
+
+def write_snapshot(areas_data, dst_path=SNAPSHOT_PATH):
+    """area.json 形式の dict から、文字列テーブルと整数配列からなるスナップショットを書き出す
+
+    ファイル構成（整数はすべてリトルエンディアンの4バイト）:
+      ヘッダ: マジック, ファイル全体のサイズ, 文字列数, 各階層の件数
+      文字列オフセット配列 (文字列数 + 1)
+      各階層ごとに: コード の文字列番号, FIELDS の各項目の文字列番号 (MISSING は無し),
+                    親の番号(-1 は無し), 子の開始位置 (件数 + 1), 子の番号
+      文字列本体 (UTF-8 を連結したもの)
+    """
+    strings = []
+    string_ids = {}
+
+    def intern(text):
+        if text is None:
+            return MISSING
+        if text not in string_ids:
+            string_ids[text] = len(strings)
+            strings.append(text.encode("utf-8"))
+        return string_ids[text]
+
+    # JSON の並び順をそのまま各階層の番号にする
+    codes = {level: list(areas_data[level].keys()) for level in LEVELS}
+    indexes = {level: {code: i for i, code in enumerate(codes[level])} for level in LEVELS}
+
+    sections = []
+    for depth, level in enumerate(LEVELS):
+        entries = areas_data[level]
+        code_ids = [intern(code) for code in codes[level]]
+        field_ids = [
+            [intern(entries[code].get(field)) for code in codes[level]]
+            for field in FIELDS
+        ]
+
+        if depth == 0:
+            parents = [-1] * len(codes[level])
+        else:
+            parent_index = indexes[LEVELS[depth - 1]]
+            parents = [parent_index.get(entries[code].get("parent"), -1) for code in codes[level]]
+
+        # 子の一覧は次の階層の parent から作る（並び順は JSON の順番）
+        children = [[] for _ in codes[level]]
+        if depth + 1 < len(LEVELS):
+            child_level = LEVELS[depth + 1]
+            for child_i, child_code in enumerate(codes[child_level]):
+                parent_i = indexes[level].get(areas_data[child_level][child_code].get("parent"))
+                if parent_i is not None:
+                    children[parent_i].append(child_i)
+        child_start = [0]
+        for child_list in children:
+            child_start.append(child_start[-1] + len(child_list))
+        child_idx = [i for child_list in children for i in child_list]
+
+        n = len(codes[level])
+        sections.append(struct.pack(f"<{n}I", *code_ids))
+        for ids in field_ids:
+            sections.append(struct.pack(f"<{n}I", *ids))
+        sections.append(struct.pack(f"<{n}i", *parents))
+        sections.append(struct.pack(f"<{n + 1}I", *child_start))
+        sections.append(struct.pack(f"<{len(child_idx)}I", *child_idx))
+
+    offsets = [0]
+    for encoded in strings:
+        offsets.append(offsets[-1] + len(encoded))
+
+    sections.insert(0, struct.pack(f"<{len(offsets)}I", *offsets))
+    sections.append(b"".join(strings))
+    total_size = HEADER.size + sum(len(section) for section in sections)
+    header = HEADER.pack(MAGIC, total_size, len(strings), *(len(codes[level]) for level in LEVELS))
+
+    # 書き込み途中のファイルを読まれないように、プロセスごとに別名の一時ファイルから置き換える
+    dst_dir = os.path.dirname(os.path.abspath(dst_path))
+    fd, tmp_path = tempfile.mkstemp(dir=dst_dir, prefix=os.path.basename(dst_path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            for section in sections:
+                f.write(section)
+        os.replace(tmp_path, dst_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return dst_path
+
+
+# ------------------------------
+# 2. 読み込み（mmap で共有、必要な階層だけ dict に展開）
+# ------------------------------
+
+class AreaSnapshot:
+    """スナップショットを mmap で開き、読み取り専用で地域データを提供する"""
+
+    def __init__(self, path=SNAPSHOT_PATH):
+        """壊れた・途中までしか書かれていないファイルの場合は ValueError を送出する"""
+        with open(path, "rb") as f:
+            # 空のファイルは mmap できず ValueError になる
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        size = len(self._mmap)
+
+        if size < HEADER.size:
+            raise ValueError(f"Truncated area snapshot: {path}")
+        magic, total_size, n_strings, *counts = HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Invalid area snapshot: {path}")
+        if total_size != size:
+            raise ValueError(f"Area snapshot size mismatch ({size} != {total_size}): {path}")
+
+        pos = HEADER.size
+
+        def take(count, fmt="I"):
+            nonlocal pos
+            if pos + count * 4 > size:
+                raise ValueError(f"Truncated area snapshot: {path}")
+            array = view[pos:pos + count * 4].cast(fmt)
+            pos += count * 4
+            return array
+
+        self._offsets = take(n_strings + 1)
+        self._levels = {}
+        for level, count in zip(LEVELS, counts):
+            code_ids = take(count)
+            field_ids = tuple(take(count) for _ in FIELDS)
+            parents = take(count, "i")
+            child_start = take(count + 1)
+            child_idx = take(child_start[count])
+            self._levels[level] = (code_ids, field_ids, parents, child_start, child_idx)
+        self._strings = view[pos:]
+        if self._offsets[n_strings] != len(self._strings):
+            raise ValueError(f"Invalid area snapshot: {path}")
+
+        self._index = {}
+        self._materialized = {}
+        self._lock = threading.Lock()
+
+    def _string(self, string_id):
+        return str(self._strings[self._offsets[string_id]:self._offsets[string_id + 1]], "utf-8")
+
+    def _code_index(self, level):
+        """コード -> 番号 の辞書（階層ごとに初回のみ作成）"""
+        index = self._index.get(level)
+        if index is None:
+            code_ids = self._levels[level][0]
+            index = {self._string(sid): i for i, sid in enumerate(code_ids)}
+            self._index[level] = index
+        return index
+
+    def _entry(self, level, i):
+        code_ids, field_ids, parents, child_start, child_idx = self._levels[level]
+        depth = LEVELS.index(level)
+        entry = {
+            field: self._string(ids[i])
+            for field, ids in zip(FIELDS, field_ids)
+            if ids[i] != MISSING
+        }
+        if parents[i] >= 0:
+            parent_code_ids = self._levels[LEVELS[depth - 1]][0]
+            entry["parent"] = self._string(parent_code_ids[parents[i]])
+        if depth + 1 < len(LEVELS):
+            child_code_ids = self._levels[LEVELS[depth + 1]][0]
+            entry["children"] = [
+                self._string(child_code_ids[c])
+                for c in child_idx[child_start[i]:child_start[i + 1]]
+            ]
+        return entry
+
+    def __getitem__(self, level):
+        """areas.json と同じ形の dict を返す（初めて参照された階層だけ展開する）"""
+        if level not in self._levels:
+            raise KeyError(level)
+        data = self._materialized.get(level)
+        if data is None:
+            with self._lock:
+                data = self._materialized.get(level)
+                if data is None:
+                    code_ids = self._levels[level][0]
+                    data = {
+                        self._string(sid): self._entry(level, i)
+                        for i, sid in enumerate(code_ids)
+                    }
+                    self._materialized[level] = data
+        return data
+
+    def items(self, level):
+        """(コード, 名前) の一覧を JSON の順番で返す"""
+        code_ids, field_ids = self._levels[level][:2]
+        return [(self._string(c), self._string(n)) for c, n in zip(code_ids, field_ids[0])]
+
+    def children(self, level, code):
+        """指定したコードの子を (コード, 名前) の一覧で返す（階層全体は展開しない）"""
+        depth = LEVELS.index(level)
+        if depth + 1 >= len(LEVELS):
+            return []
+        i = self._code_index(level).get(code)
+        if i is None:
+            return []
+        child_start, child_idx = self._levels[level][3:]
+        child_code_ids, child_field_ids = self._levels[LEVELS[depth + 1]][:2]
+        return [
+            (self._string(child_code_ids[c]), self._string(child_field_ids[0][c]))
+            for c in child_idx[child_start[i]:child_start[i + 1]]
+        ]
+
+
+_snapshots = {}
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot(path=SNAPSHOT_PATH, src_path=AREA_FILE_PATH):
+    """プロセス内でパスごとに1度だけスナップショットを開き、全セッションで共有する
+
+    スナップショットが無いか src_path より古い場合はその場でビルドする。
+    読み込みに失敗した場合も1度だけビルドし直す。
+    src_path が None の場合はビルドせず、既存のスナップショットをそのまま使う。
+    """
+    snapshot = _snapshots.get(path)
+    if snapshot is None:
+        with _snapshot_lock:
+            snapshot = _snapshots.get(path)
+            if snapshot is None:
+                if src_path is not None and (not os.path.exists(path) or (
+                    os.path.exists(src_path)
+                    and os.path.getmtime(path) < os.path.getmtime(src_path)
+                )):
+                    build_snapshot(src_path, path)
+                try:
+                    snapshot = AreaSnapshot(path)
+                except ValueError as e:
+                    if src_path is None:
+                        raise
+                    print(f"Rebuilding area snapshot: {e}")
+                    build_snapshot(src_path, path)
+                    snapshot = AreaSnapshot(path)
+                _snapshots[path] = snapshot
+    return snapshot
+
+
+if __name__ == "__main__":
+    print(f"スナップショットを作成しました: {build_snapshot()}")
@@ -0,0 +1,225 @@
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DB_PATH = 'jma/weather.db'
+HOST = "127.0.0.1"
+PORT = 8000
+RELOAD_INTERVAL = 5  # 取り込み完了を確認する間隔(秒)
+
+
+# ------------------------------
+# 1. レスポンスの事前計算
+# ------------------------------
+
+class Response:
+    """シリアライズ済みのJSONとそのgzip版、それぞれのETagをまとめて保持する"""
+
+    __slots__ = ("body", "gzip_body", "etag", "gzip_etag")
+
+    def __init__(self, data):
+        self.body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.gzip_body = gzip.compress(self.body, compresslevel=9, mtime=0)
+        digest = hashlib.sha1(self.body).hexdigest()
+        # バイト列が異なるので gzip 版には別のETagを付ける
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gz"'
+
+
+def build_responses(db_path=DB_PATH):
+    """
+    weather.db を読み込み、パスごとのレスポンスを作成して辞書で返す。
+      /regions                  地方と都道府県の一覧
+      /offices/{prefecture_id}  都道府県内の全エリアの予報
+      /areas/{area_id}          エリアの予報
+    """
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    cursor = conn.cursor()
+
+    cursor.execute('SELECT region_id, region_name FROM regions ORDER BY region_id')
+    regions = [{"id": region_id, "name": region_name, "prefectures": []}
+               for region_id, region_name in cursor.fetchall()]
+    regions_by_id = {region["id"]: region for region in regions}
+
+    cursor.execute('SELECT prefecture_id, prefecture_name, region_id FROM prefectures ORDER BY prefecture_id')
+    prefectures = {}
+    for prefecture_id, prefecture_name, region_id in cursor.fetchall():
+        prefectures[prefecture_id] = {"id": prefecture_id, "name": prefecture_name,
+                                      "region_id": region_id, "areas": []}
+        if region_id in regions_by_id:
+            regions_by_id[region_id]["prefectures"].append(
+                {"id": prefecture_id, "name": prefecture_name})
+
+    cursor.execute('SELECT area_id, area_name, prefecture_id FROM areas ORDER BY area_id')
+    areas = {}
+    for area_id, area_name, prefecture_id in cursor.fetchall():
+        areas[area_id] = {"id": area_id, "name": area_name,
+                          "prefecture_id": prefecture_id, "forecasts": []}
+        if prefecture_id in prefectures:
+            prefectures[prefecture_id]["areas"].append(areas[area_id])
+
+    # 予報は1回のクエリでまとめて取得する
+    cursor.execute('''
+    SELECT area_id, date, weather, wind, wave, created_at
+    FROM weather_forecasts ORDER BY area_id, date
+    ''')
+    for area_id, date, weather, wind, wave, created_at in cursor.fetchall():
+        if area_id in areas:
+            areas[area_id]["forecasts"].append({
+                "date": str(date), "weather": weather, "wind": wind,
+                "wave": wave, "updated_at": created_at,
+            })
+    conn.close()
+
+    responses = {"/regions": Response({"regions": regions})}
+    for prefecture_id, prefecture in prefectures.items():
+        responses[f"/offices/{prefecture_id}"] = Response(prefecture)
+    for area_id, area in areas.items():
+        responses[f"/areas/{area_id}"] = Response(area)
+    return responses
+
+
+def marker_mtime(marker_path):
+    """取り込み完了ファイルの更新時刻(無ければ None)"""
+    try:
+        return os.path.getmtime(marker_path)
+    except OSError:
+        return None
+
+
+class ResponseStore:
+    """事前計算したレスポンスを保持し、取り込みが完了するたびに作り直す
+
+    main_db.py は都道府県ごとにコミットするため、weather.db 自体の更新時刻を見ると
+    取り込み途中の状態を配信してしまう。そこで取り込みの最後に更新される
+    完了ファイル(marker_path)の更新時刻が変わったときだけ作り直す。
+    """
+
+    def __init__(self, db_path=DB_PATH, marker_path=None):
+        self.db_path = db_path
+        self.marker_path = marker_path or db_path + '.ingested'
+        self.responses = {}
+        self.marker_mtime = None
+        self.reload()
+
+    def reload(self):
+        mtime = marker_mtime(self.marker_path)
+        responses = build_responses(self.db_path)
+        # 辞書ごと差し替えるので、処理中のリクエストはロックなしで読める
+        self.responses = responses
+        self.marker_mtime = mtime
+        print(f"[Info] Loaded {len(responses)} responses from {self.db_path}")
+
+    def reload_if_changed(self):
+        try:
+            if marker_mtime(self.marker_path) != self.marker_mtime:
+                self.reload()
+        except (OSError, sqlite3.Error) as e:
+            print(f"Error reloading responses: {e}")
+
+    def watch(self, interval=RELOAD_INTERVAL):
+        """取り込み(main_db.py)の完了後に自動で作り直すための監視スレッドを開始する"""
+        def loop():
+            while True:
+                time.sleep(interval)
+                self.reload_if_changed()
+        thread = threading.Thread(target=loop, daemon=True)
+        thread.start()
+        return thread
+
+
+# ------------------------------
+# 2. HTTPサーバー
+# ------------------------------
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match ヘッダーに etag が含まれるか(弱い比較、"*" にも対応)"""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+class ForecastHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive を有効にする
+    disable_nagle_algorithm = True  # ヘッダーと本文を別々に送っても遅延させない
+    store = None
+
+    def do_GET(self):
+        response = self.store.responses.get(self.path.split("?", 1)[0].rstrip("/"))
+        if response is None:
+            self.send_error_json(404, "not found")
+            return
+
+        use_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+        etag = response.gzip_etag if use_gzip else response.etag
+
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            self.send_response(304)
+            self.send_cache_headers(etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = response.gzip_body if use_gzip else response.body
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_cache_headers(etag)
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_cache_headers(self, etag):
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+
+    def send_error_json(self, status, message):
+        body = json.dumps({"error": message}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # リクエストごとのログは負荷が大きいので出力しない
+        pass
+
+
+def create_server(db_path=DB_PATH, host=HOST, port=PORT, marker_path=None):
+    store = ResponseStore(db_path, marker_path)
+    handler = type("Handler", (ForecastHandler,), {"store": store})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server, store
+
+
+def main():
+    server, store = create_server()
+    store.watch()
+    print(f"[Info] Serving forecasts on http://{HOST}:{PORT}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
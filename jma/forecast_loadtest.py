@@ -0,0 +1,117 @@
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+
+HOST = "127.0.0.1"
+PORT = 8000
+
+
+def percentile(values, p):
+    """ソート済みのリストから p パーセンタイルを返す"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def get_json(conn, path):
+    conn.request("GET", path)
+    return json.loads(conn.getresponse().read())
+
+
+def fetch_paths(host, port):
+    """/regions と /offices から負荷をかけるパスの一覧を作成する(/areas を含む)"""
+    conn = http.client.HTTPConnection(host, port)
+    paths = ["/regions"]
+    for region in get_json(conn, "/regions")["regions"]:
+        for prefecture in region["prefectures"]:
+            office_path = f"/offices/{prefecture['id']}"
+            paths.append(office_path)
+            paths.extend(f"/areas/{area['id']}" for area in get_json(conn, office_path)["areas"])
+    conn.close()
+    return paths
+
+
+def worker(host, port, paths, deadline, use_etag, latencies, statuses, errors):
+    """1本のkeep-alive接続でリクエストを送り続ける"""
+    conn = http.client.HTTPConnection(host, port)
+    etags = {}
+    while time.perf_counter() < deadline:
+        path = random.choice(paths)
+        headers = {"Accept-Encoding": "gzip"}
+        if use_etag and path in etags:
+            headers["If-None-Match"] = etags[path]
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            errors.append(path)
+            conn.close()
+            conn = http.client.HTTPConnection(host, port)
+            continue
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status] = statuses.get(response.status, 0) + 1
+        if response.status == 200:
+            etags[path] = response.getheader("ETag")
+        elif response.status != 304:
+            errors.append(path)
+    conn.close()
+
+
+def run(host=HOST, port=PORT, clients=16, duration=10.0, use_etag=True):
+    """負荷をかけて requests/sec と レイテンシ(p50/p99) を返す"""
+    paths = fetch_paths(host, port)
+    deadline = time.perf_counter() + duration
+    results = [([], {}, []) for _ in range(clients)]
+    threads = [
+        threading.Thread(target=worker,
+                         args=(host, port, paths, deadline, use_etag, latencies, statuses, errors))
+        for latencies, statuses, errors in results
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for thread_latencies, _, _ in results for latency in thread_latencies)
+    errors = sum(len(thread_errors) for _, _, thread_errors in results)
+    return {
+        "paths": len(paths),
+        "requests": len(latencies),
+        "ok_200": sum(statuses.get(200, 0) for _, statuses, _ in results),
+        "not_modified_304": sum(statuses.get(304, 0) for _, statuses, _ in results),
+        "errors": errors,
+        "requests_per_sec": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="forecast_api.py の負荷テスト")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--clients", type=int, default=16, help="同時接続数")
+    parser.add_argument("--duration", type=float, default=10.0, help="実行時間(秒)")
+    parser.add_argument("--no-etag", action="store_true", help="If-None-Match を送らない")
+    args = parser.parse_args()
+
+    result = run(args.host, args.port, args.clients, args.duration, not args.no_etag)
+    print(f"paths:        {result['paths']}")
+    print(f"requests:     {result['requests']} (errors: {result['errors']})")
+    print(f"  200:        {result['ok_200']}")
+    print(f"  304:        {result['not_modified_304']}")
+    print(f"requests/sec: {result['requests_per_sec']:.1f}")
+    print(f"p50 latency:  {result['p50_ms']:.2f} ms")
+    print(f"p99 latency:  {result['p99_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,17 @@
 import flet as ft
-import json
 
-# ローカルのエリアデータファイルのパス
-AREA_FILE_PATH = "/Users/hinenoyamao/Lecture/DSp2/jma/areas.json"
+from area_snapshot import get_snapshot
+
 FORECAST_URL = "https://www.jma.go.jp/bosai/forecast/data/forecast/{}.json"
 
-# 地域データをローカルファイルから取得して階層構造を作成
+# 地域データをスナップショットから取得して階層構造を作成
 def fetch_area_hierarchy():
-    """ローカルファイルから地域データを読み込み、階層構造を生成"""
+    """プロセス共有のスナップショットから地域データの階層構造を取得"""
     try:
-        with open(AREA_FILE_PATH, "r", encoding="utf-8") as f:
-            areas_data = json.load(f)
-        
-        # 必要なデータを階層構造で統合
-        return {
-            "centers": areas_data["centers"],
-            "offices": areas_data["offices"]
-        }
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        print(f"Error loading area data from file: {e}")
+        # class15s / class20s は参照されるまで展開されない
+        return get_snapshot()
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error loading area data from snapshot: {e}")
         return None
 
 # 天気予報データを取得
@@ -105,9 +98,8 @@ def main(page: ft.Page):
             details_dropdown.disabled = True
         else:
             offices_dropdown.options = [
-                ft.dropdown.Option(key=key, text=value["name"])
-                for key, value in area_hierarchy["offices"].items()
-                if value["parent"] == selected_center
+                ft.dropdown.Option(key=key, text=name)
+                for key, name in area_hierarchy.children("centers", selected_center)
             ]
             offices_dropdown.disabled = False
 
@@ -148,8 +140,8 @@ def main(page: ft.Page):
 
     # ドロップダウンの初期化
     centers_dropdown.options = [
-        ft.dropdown.Option(key=key, text=value["name"])
-        for key, value in area_hierarchy["centers"].items()
+        ft.dropdown.Option(key=key, text=name)
+        for key, name in area_hierarchy.items("centers")
     ]
     centers_dropdown.on_change = on_center_select
     offices_dropdown.on_change = on_office_select
@@ -4,7 +4,13 @@ import datetime
 
 import os
 
+from area_snapshot import write_snapshot
+
 db_path = 'jma/weather.db'
+# 取り込んだ地域データと同じ内容のスナップショット（画面のドロップダウン用）
+area_snapshot_path = 'jma/weather_areas.snapshot'
+# 取り込み完了を forecast_api.py に知らせるファイル
+ingest_marker_path = db_path + '.ingested'
 
 # ディレクトリの確認
 db_dir = os.path.dirname(db_path)
@@ -114,6 +120,9 @@ for area_id in sorted(class10s.keys()):
 
 conn.commit()
 
+# データベースに入れたものと同じ地域データからスナップショットを作成します。
+write_snapshot(area_data, area_snapshot_path)
+
 # ------------------------------
 # 3. 天気予報データの取得と挿入
 # ------------------------------
@@ -183,9 +192,15 @@ for prefecture in prefectures_list:
 # データベース接続を閉じます。
 conn.close()
 
+# 取り込みが完了したことを記録します（forecast_api.py はこれを見て作り直します）。
+with open(ingest_marker_path, 'w') as f:
+    f.write(datetime.datetime.now().isoformat())
+
 import flet as ft
 import sqlite3
 
+from area_snapshot import get_snapshot
+
 def main(page: ft.Page):
     page.title = "天気予報アプリ"
     page.padding = 20
@@ -207,17 +222,17 @@ def main(page: ft.Page):
     selected_prefecture_id = None
     selected_area_id = None
     
-    # 地方のデータを取得（データベースの順番で）
-    cursor.execute('SELECT region_id, region_name FROM regions')
-    regions = cursor.fetchall()
+    # 地方・都道府県・一次細分区域はプロセス共有のスナップショットから取得
+    # （取り込み時に作成したものなので、weather_forecasts のエリアと一致する）
+    area_snapshot = get_snapshot(area_snapshot_path, src_path=None)
+    regions = area_snapshot.items("centers")
     
     # イベントハンドラを定義
     def on_region_change(e):
         nonlocal selected_region_id
         selected_region_id = region_dropdown.value
-        # 都道府県ドロップダウンを更新（データベースの順番で）
-        cursor.execute('SELECT prefecture_id, prefecture_name FROM prefectures WHERE region_id = ?', (selected_region_id,))
-        prefectures = cursor.fetchall()
+        # 都道府県ドロップダウンを更新（スナップショットの順番で）
+        prefectures = area_snapshot.children("centers", selected_region_id)
         prefecture_dropdown.options = [ft.dropdown.Option(pref_id, pref_name) for pref_id, pref_name in prefectures]
         prefecture_dropdown.disabled = False
         prefecture_dropdown.value = None
@@ -237,9 +252,8 @@ def main(page: ft.Page):
     def on_prefecture_change(e):
         nonlocal selected_prefecture_id
         selected_prefecture_id = prefecture_dropdown.value
-        # エリアドロップダウンを更新（データベースの順番で）
-        cursor.execute('SELECT area_id, area_name FROM areas WHERE prefecture_id = ?', (selected_prefecture_id,))
-        areas = cursor.fetchall()
+        # エリアドロップダウンを更新（スナップショットの順番で）
+        areas = area_snapshot.children("offices", selected_prefecture_id)
         area_dropdown.options = [ft.dropdown.Option(area_id, area_name) for area_id, area_name in areas]
         area_dropdown.disabled = False
         area_dropdown.value = None
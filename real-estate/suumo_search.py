@@ -0,0 +1,254 @@
+import re
+import sqlite3
+import time
+import unicodedata
+
+DB_NAME = "suumo_data.db"  # スクレイピングで作成したSQLiteのファイル名
+TABLE_NAME = "suumo_listings"
+
+# "ＪＲ総武線/西千葉駅 歩10分" や "京成千葉線/みどり台駅 バス5分 (バス停)緑町 歩2分" を想定
+ACCESS_PATTERN = re.compile(
+    r"(?P<line>[^・/]+)/(?P<station>[^・/\s]+?)駅?\s*"
+    r"(?:バス(?P<bus>\d+)分[^・]*?)?歩(?P<walk>\d+)分"
+)
+NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+
+
+def normalize(text):
+    """全角英数字などを半角にそろえる"""
+    return unicodedata.normalize("NFKC", text or "").strip()
+
+
+def parse_accesses(accesses):
+    """
+    "・" 区切りのアクセス情報を (路線, 駅, 徒歩分, バス分) のリストに分解する。
+    バスを使わない場合、バス分は None。
+    """
+    results = []
+    for match in ACCESS_PATTERN.finditer(normalize(accesses)):
+        bus = match.group("bus")
+        results.append((
+            match.group("line").strip(),
+            match.group("station").strip(),
+            int(match.group("walk")),
+            int(bus) if bus else None,
+        ))
+    return results
+
+
+def parse_number(text):
+    """ "18万円" -> 18.0, "72.81m2" -> 72.81 (取得できなければ None) """
+    match = NUMBER_PATTERN.search(normalize(text))
+    return float(match.group()) if match else None
+
+
+def station_key(station):
+    """検索用に駅名をそろえる("西千葉駅" -> "西千葉")"""
+    station = normalize(station)
+    return station[:-1] if station.endswith("駅") and len(station) > 1 else station
+
+
+# ------------------------------
+# 1. インデックスの作成
+# ------------------------------
+
+def init_index(conn, table_name=TABLE_NAME):
+    """
+    検索用のテーブルとインデックスを作成する。(存在しなければ作成)
+      - suumo_accesses: 1物件につき駅ごとに1行 (路線, 駅, 徒歩分)
+      - suumo_values:   賃料・専有面積を数値にしたもの
+      - suumo_fts:      物件名とアクセス情報の全文検索(FTS5, trigram)
+    """
+    cur = conn.cursor()
+    cur.executescript(f"""
+    CREATE TABLE IF NOT EXISTS suumo_accesses (
+        listing_id INTEGER NOT NULL REFERENCES {table_name}(id),
+        line TEXT NOT NULL,
+        station TEXT NOT NULL,
+        walk_minutes INTEGER NOT NULL,
+        bus_minutes INTEGER
+    );
+    CREATE INDEX IF NOT EXISTS idx_accesses_station_walk
+        ON suumo_accesses (station, walk_minutes, listing_id);
+    CREATE INDEX IF NOT EXISTS idx_accesses_line_station_walk
+        ON suumo_accesses (line, station, walk_minutes, listing_id);
+    CREATE INDEX IF NOT EXISTS idx_accesses_listing
+        ON suumo_accesses (listing_id);
+
+    CREATE TABLE IF NOT EXISTS suumo_values (
+        listing_id INTEGER PRIMARY KEY REFERENCES {table_name}(id),
+        rent REAL,
+        area REAL
+    );
+    CREATE INDEX IF NOT EXISTS idx_values_rent_area ON suumo_values (rent, area);
+
+    CREATE VIRTUAL TABLE IF NOT EXISTS suumo_fts USING fts5(
+        building_name, accesses, tokenize='trigram'
+    );
+    """)
+    conn.commit()
+
+
+def build_index(conn, table_name=TABLE_NAME, rebuild=False):
+    """
+    suumo_listings の内容を検索用テーブルに反映する。
+    まだインデックスされていない物件だけを追加するので、スクレイピングのたびに呼んでよい。
+    rebuild=True の場合は全件を作り直す。
+    戻り値は追加した物件数。
+    """
+    init_index(conn, table_name)
+    cur = conn.cursor()
+    if rebuild:
+        cur.execute("DELETE FROM suumo_accesses")
+        cur.execute("DELETE FROM suumo_values")
+        cur.execute("DELETE FROM suumo_fts")
+
+    # suumo_values に無い物件が未インデックス
+    cur.execute(f"""
+    SELECT l.id, l.building_name, l.rent, l.area, l.accesses
+    FROM {table_name} AS l
+    LEFT JOIN suumo_values AS v ON v.listing_id = l.id
+    WHERE v.listing_id IS NULL
+    """)
+    rows = cur.fetchall()
+
+    access_records = []
+    value_records = []
+    fts_records = []
+    for listing_id, building_name, rent, area, accesses in rows:
+        for line, station, walk, bus in parse_accesses(accesses):
+            access_records.append((listing_id, line, station_key(station), walk, bus))
+        value_records.append((listing_id, parse_number(rent), parse_number(area)))
+        fts_records.append((listing_id, normalize(building_name), normalize(accesses)))
+
+    # まとめてINSERTする
+    cur.executemany("""
+    INSERT INTO suumo_accesses (listing_id, line, station, walk_minutes, bus_minutes)
+    VALUES (?, ?, ?, ?, ?)
+    """, access_records)
+    cur.executemany("""
+    INSERT INTO suumo_values (listing_id, rent, area) VALUES (?, ?, ?)
+    """, value_records)
+    cur.executemany("""
+    INSERT INTO suumo_fts (rowid, building_name, accesses) VALUES (?, ?, ?)
+    """, fts_records)
+    conn.commit()
+    cur.execute("ANALYZE")
+    return len(rows)
+
+
+# ------------------------------
+# 2. 検索
+# ------------------------------
+
+def search_listings(conn, station=None, max_walk=None, line=None, text=None,
+                    min_rent=None, max_rent=None, min_area=None, max_area=None,
+                    include_bus=False, limit=50, table_name=TABLE_NAME):
+    """
+    条件に合う物件を返す。(build_index を実行済みであること)
+      station:  駅名 ("西千葉" / "西千葉駅")
+      max_walk: 駅からの徒歩分の上限 (駅を指定しない場合はいずれかの駅から)
+      line:     路線名
+      text:     物件名・アクセス情報に含まれる文字列
+      min_rent / max_rent: 賃料(万円)の範囲
+      min_area / max_area: 専有面積(m2)の範囲
+      include_bus: True ならバス利用のアクセスも対象にする
+    駅・路線・徒歩分を指定した場合は徒歩分の短い順、それ以外は賃料の安い順に並べる。
+    (賃料が取得できなかった物件は最後)
+    """
+    conditions = []
+    params = []
+    joins = [f"JOIN {table_name} AS l ON l.id = v.listing_id"]
+    select_walk = "NULL"
+    order_by = "v.rent IS NULL, v.rent, v.listing_id"
+
+    if station or line or max_walk is not None:
+        # 物件ごとに条件に合う最短の徒歩分を1件だけ使う(複数路線で重複しないように)
+        access_conditions = []
+        access_params = []
+        if station:
+            access_conditions.append("station = ?")
+            access_params.append(station_key(station))
+        if line:
+            access_conditions.append("line = ?")
+            access_params.append(normalize(line))
+        if max_walk is not None:
+            access_conditions.append("walk_minutes <= ?")
+            access_params.append(max_walk)
+        if not include_bus:
+            access_conditions.append("bus_minutes IS NULL")
+        joins.insert(0, f"""JOIN (
+            SELECT listing_id, MIN(walk_minutes) AS walk_minutes
+            FROM suumo_accesses
+            {"WHERE " + " AND ".join(access_conditions) if access_conditions else ""}
+            GROUP BY listing_id
+        ) AS a ON a.listing_id = v.listing_id""")
+        params.extend(access_params)
+        select_walk = "a.walk_minutes"
+        order_by = "a.walk_minutes, v.rent IS NULL, v.rent, v.listing_id"
+
+    # 空白だけの文字列は条件なしとして扱う
+    text = normalize(text)
+    if len(text) >= 3:
+        # trigram のFTSは3文字以上で使える
+        conditions.append("v.listing_id IN (SELECT rowid FROM suumo_fts WHERE suumo_fts MATCH ?)")
+        params.append('"' + text.replace('"', '""') + '"')
+    elif text:
+        # 2文字以下は suumo_fts の正規化済みの列を順に調べる
+        # (trigram のテーブルでは短い LIKE が正しく一致しないため instr を使う)
+        conditions.append("""v.listing_id IN (
+            SELECT rowid FROM suumo_fts
+            WHERE instr(lower(building_name), lower(?)) > 0
+               OR instr(lower(accesses), lower(?)) > 0
+        )""")
+        params.extend([text, text])
+
+    for column, operator, value in (
+        ("v.rent", ">=", min_rent),
+        ("v.rent", "<=", max_rent),
+        ("v.area", ">=", min_area),
+        ("v.area", "<=", max_area),
+    ):
+        if value is not None:
+            conditions.append(f"{column} {operator} ?")
+            params.append(value)
+
+    query = f"""
+    SELECT l.id, l.building_name, l.rent, l.area, l.direction,
+           l.building_type, l.building_age, l.accesses, {select_walk}
+    FROM suumo_values AS v
+    {" ".join(joins)}
+    {"WHERE " + " AND ".join(conditions) if conditions else ""}
+    ORDER BY {order_by}
+    LIMIT ?
+    """
+    params.append(limit)
+
+    cur = conn.cursor()
+    cur.execute(query, params)
+    columns = ["id", "building_name", "rent", "area", "direction",
+               "building_type", "building_age", "accesses", "walk_minutes"]
+    return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+
+def main():
+    conn = sqlite3.connect(DB_NAME)
+
+    # --------- 1. インデックスの更新 ----------
+    start = time.perf_counter()
+    added = build_index(conn)
+    print(f"[Info] Indexed {added} listings in {time.perf_counter() - start:.2f}s.")
+
+    # --------- 2. 検索の例 ----------
+    start = time.perf_counter()
+    results = search_listings(conn, station="西千葉", max_walk=10, max_rent=8)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"[Info] 西千葉駅 徒歩10分以内・8万円以下: {len(results)} 件 ({elapsed:.1f}ms)")
+    for item in results[:10]:
+        print(f"  {item['building_name']} {item['rent']} {item['area']} 歩{item['walk_minutes']}分")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()